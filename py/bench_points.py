@@ -0,0 +1,33 @@
+"""
+Throughput of pytest_lib.get_points at N ~ 10^6.
+
+    python py/bench_points.py [--repeat 5]
+"""
+import argparse
+import time
+
+import pytest_lib
+
+# spacing giving ~10^6 points: jittered is exactly (2/r)^2, Bridson packs ~0.68/r^2 points per unit area
+CASES = [
+    ("jittered", 0.002),
+    ("poisson",  0.00165),
+]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    for pattern, radius in CASES:
+        times = []
+        for seed in range(args.repeat):
+            t0 = time.perf_counter()
+            pts = pytest_lib.get_points(radius, pattern, seed)
+            times.append(time.perf_counter() - t0)
+
+        best = min(times)
+        print(f"{pattern:<9} radius={radius:<8} N={len(pts):>9,}  best {best * 1000:8.1f} ms  {len(pts) / best / 1e6:6.2f} Mpts/s")
+
+if __name__ == "__main__":
+    main()
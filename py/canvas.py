@@ -1,7 +1,54 @@
 from PySide6.QtWidgets import QApplication,QMainWindow, QWidget, QVBoxLayout, QPushButton, QLabel, QSlider, QMessageBox, QFrame, QGridLayout
-from PySide6.QtGui import QPainter, QPen, QBrush, QColor, QTransform
+from PySide6.QtGui import QPainter, QPen, QBrush, QColor, QTransform, QImage
 from PySide6.QtCore import Qt, QThread, Signal, QLineF, QPointF
 
+POINT_COLOR = QColor(30, 144, 255, 220)
+
+def render_points(pts, size, point_radius, color=POINT_COLOR):
+    """
+    Rasterizes (N,2) logical points as discs of `point_radius` into a transparent QImage of `size`
+    (the canvas contents size). Safe to call off the GUI thread.
+
+    Cost stays bounded either way: many points means tiny discs, which are stamped for all points at
+    once with numpy (one pass per disc pixel); few points with big discs are painted one by one.
+    """
+    # numpy is only needed once points arrive, keep it off the startup path
+    import numpy as np
+
+    w, h = size.width(), size.height()
+    rx, ry = point_radius * w / 2.0, point_radius * h / 2.0
+
+    R = int(np.ceil(max(rx, ry)))
+    dy, dx = np.mgrid[-R:R + 1, -R:R + 1]
+    stamp = (dx / max(rx, 0.5)) ** 2 + (dy / max(ry, 0.5)) ** 2 <= 1.0
+
+    if stamp.sum() > len(pts):
+        img = QImage(w, h, QImage.Format_ARGB32_Premultiplied)
+        img.fill(Qt.transparent)
+        p = QPainter(img)
+        p.setRenderHints(QPainter.Antialiasing)
+        p.setPen(Qt.NoPen)
+        p.setBrush(QBrush(color))
+        for x, y in pts.tolist():
+            p.drawEllipse(QPointF((x + 1.0) * 0.5 * w, (1.0 - y) * 0.5 * h), rx, ry)
+        p.end()
+        return img
+
+    # pixel centres, y flipped (logical y grows upwards)
+    px = np.floor((pts[:, 0] + 1.0) * 0.5 * w).astype(np.int64)
+    py = np.floor((1.0 - pts[:, 1]) * 0.5 * h).astype(np.int64)
+
+    mask = np.zeros((h, w), dtype=bool)
+    for oy, ox in zip(dy[stamp], dx[stamp]):
+        y, x = py + oy, px + ox
+        # disc pixels outside the image are dropped, not clamped onto the border
+        inside = (y >= 0) & (y < h) & (x >= 0) & (x < w)
+        mask[y[inside], x[inside]] = True
+
+    argb = np.where(mask, np.uint32(color.rgba()), np.uint32(0)).astype(np.uint32)
+    img = QImage(argb.data, w, h, 4 * w, QImage.Format_ARGB32)
+    return img.copy()  # detach from the numpy buffer
+
 
 class Canvas(QFrame):
     def __init__(self, parent=None):
@@ -17,11 +64,20 @@ class Canvas(QFrame):
 
         # State
         self._bg = self.palette().base().color()
-        self._points = []  # stored in LOGICAL space (-1..1, -1..1)
+        self._points_image = None  # points pre-rendered at contents size, see render_points
         self.setMouseTracking(True)
 
-    def set_points(self, pts):
-      self._points = pts
+    def set_points(self, pts, point_radius=0.02):
+      """
+      pts: (N,2) float32 array in logical coords, e.g. from pytest_lib.get_points
+      """
+      self.set_points_image(render_points(pts, self.contentsRect().size(), point_radius))
+
+    def set_points_image(self, img):
+      """
+      Shows an image made by render_points, e.g. on a worker thread.
+      """
+      self._points_image = img
       self.update()
 
     # setup coord system from (-1,-1) to (1,1)
@@ -56,7 +112,7 @@ class Canvas(QFrame):
         #    self.update()
 
     def clear(self):
-        self._points.clear()
+        self._points_image = None
         self.update()
 
     # --- Painting ------------------------------------------------------------
@@ -99,17 +155,13 @@ class Canvas(QFrame):
         p.drawLine(-1.0, 0.0, 1.0, 0.0)  # x-axis
         p.drawLine(0.0, -1.0, 0.0, 1.0)  # y-axis
 
-        # Points drawn in logical space
-        p.setPen(Qt.NoPen)
-        p.setBrush(QBrush(QColor(30, 144, 255, 220)))
-        r = 0.02  # logical radius (~2% of height/width)
-        for pt in self._points:
-          print(pt)
-          pt = QPointF(pt.x, pt.y)
-          p.drawEllipse(pt, r, r)
-
         # 3) If you need device-space text/UI overlays, reset transform:
         p.resetTransform()
+
+        # Points, pre-rendered in device space
+        if self._points_image is not None:
+          p.drawImage(rect.topLeft(), self._points_image)
+
         p.setPen(QColor(60, 60, 60))
         p.drawText(rect.adjusted(8, 6, -8, -6), Qt.AlignTop | Qt.AlignLeft, "Logical coords: (-1,-1) bottom-left to (1,1) top-right")
 
@@ -0,0 +1,32 @@
+import numpy as np
+
+import pytest_lib
+
+def generate(prefix, depth, coeff=None):
+    """
+    Generates a depth `depth` SH mesh out of core into `<prefix>.vtx` / `<prefix>.idx`,
+    see pytest_lib.generate_chunked_mesh. Returns the pytest_lib.ChunkedMesh describing the files.
+    """
+    return pytest_lib.generate_chunked_mesh(prefix, depth, coeff)
+
+def open_arrays(chunked):
+    """
+    Returns (vertices, indices) as read-only memory-mapped arrays:
+      vertices: (num_vertices, 6)  float32, [x, y, z, nx, ny, nz]
+      indices:  (num_triangles, 3) uint32
+    """
+    vertices = np.memmap(chunked.vertex_path, dtype='<f4', mode='r', shape=(chunked.num_vertices, 6))
+    indices  = np.memmap(chunked.index_path,  dtype='<u4', mode='r', shape=(chunked.num_triangles, 3))
+    return vertices, indices
+
+def iter_patches(chunked):
+    """
+    Yields (positions, normals, indices) per patch (octant). positions/normals are (N,3) views of the
+    whole vertex file, since indices are global and patches share the vertices along their seams;
+    indices is the (M,3) slice of the patch. Nothing is read until the arrays are touched.
+    """
+    vertices, indices = open_arrays(chunked)
+    positions, normals = vertices[:, :3], vertices[:, 3:]
+
+    for first, count in chunked.patches:
+        yield positions, normals, indices[first:first + count]
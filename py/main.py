@@ -1,25 +1,16 @@
+import startup_timing
+
 import sys
-from PySide6.QtCore import Qt, QThread, Signal, QLineF, QPointF
-from PySide6.QtWidgets import QApplication,QMainWindow, QWidget, QVBoxLayout, QPushButton, QLabel, QSlider, QMessageBox, QFrame, QGridLayout
-import time
-import mesh_viewer
-import canvas
+from PySide6.QtCore import Qt, QTimer
+from PySide6.QtWidgets import QApplication, QMainWindow, QWidget, QPushButton, QLabel, QSlider, QMessageBox, QGridLayout
 
-# from PySide6.QtCore import Qt, QPointF
-from PySide6.QtGui import QPainter, QPen, QBrush, QColor, QTransform
-# from PySide6.QtWidgets import QApplication, QWidget, QVBoxLayout, QPushButton, QFrame, QLabel
+from worker import Worker
+import canvas
 
-class Worker(QThread):
-  def __init__(self, f):
-    super().__init__()
-    self._f = f
+# mesh_viewer (Qt3D, numpy) and pytest_lib are imported lazily, after the window is up
 
-  def run(self):
-    self._result = self._f()
+startup_timing.mark("imports")
 
-  def get_result(self):
-    return self._result
-  
 class MyWindow(QMainWindow):
   def __init__(self):
     super().__init__()
@@ -47,7 +38,7 @@ class MyWindow(QMainWindow):
     g.addWidget(self.radius_label, 1, 0)
 
     self.slider = QSlider(Qt.Horizontal)
-    self.slider.setRange(0, 1000)
+    self.slider.setRange(1, 1000)  # radius 0.001 .. 1, see pytest_lib.get_points
 
     self.slider.valueChanged.connect(self.update_radius_label)
     self.slider.valueChanged.connect(self.start_worker)
@@ -56,23 +47,54 @@ class MyWindow(QMainWindow):
 
     g.addWidget(self.button, 3, 0)
 
-    # self.canvas = canvas.Canvas()
-    #g.addWidget(self.canvas, 0, 1, 100, 1)
+    self.canvas = canvas.Canvas()
+    g.addWidget(self.canvas, 0, 1, 100, 1)
 
 
-    self.mesh_viewer = mesh_viewer.MeshViewer()
+    # placeholder until the first event loop iteration, so the window shows before Qt3D is loaded
+    self.mesh_viewer = QLabel("Loading 3D view…")
+    self.mesh_viewer.setFixedSize(1024, 1024)
+    self.mesh_viewer.setAlignment(Qt.AlignCenter)
 
+    self._grid = g
     g.addWidget(self.mesh_viewer, 0, 2, 100, 1)
 
     g.setRowStretch(100, 1.0)
     self.update_radius_label()
+
+    # Qt3D is only loaded after the first paint, see paintEvent
+    self._viewer_pending = True
+
+  def _create_mesh_viewer(self):
+    import mesh_viewer
+
+    viewer = mesh_viewer.MeshViewer()
+    viewer.meshReady.connect(self.on_mesh_ready)
+
+    self._grid.replaceWidget(self.mesh_viewer, viewer)
+    self.mesh_viewer.deleteLater()
+    self.mesh_viewer = viewer
+
+  def on_mesh_ready(self):
+    startup_timing.mark("first mesh")
+    if startup_timing.enabled:
+      print(startup_timing.report())
+
+  def paintEvent(self, event):
+    super().paintEvent(event)
+    startup_timing.mark("first paint")
+
+    # queued, so the frame with the placeholder is flushed to the screen before Qt3D loads
+    if self._viewer_pending:
+      self._viewer_pending = False
+      QTimer.singleShot(0, self._create_mesh_viewer)
   
   def get_radius(self):
     return self.slider.value() / 1000.0
   
   def update_radius_label(self):
     radius = self.get_radius()
-    self.radius_label.setText(f"Radius: {radius:.2f}")
+    self.radius_label.setText(f"Radius: {radius:.3f}")
 
   def on_button_clicked(self):
     if self._worker is not None:
@@ -85,16 +107,20 @@ class MyWindow(QMainWindow):
     if self._worker is not None:
       return
     
+    import pytest_lib
+
     radius = self.get_radius()
 
-    self._worker = Worker(lambda: pytest_lib.get_points(radius))
+    size = self.canvas.contentsRect().size()
+
+    # points are generated and rasterized off the GUI thread, the canvas only blits the image
+    self._worker = Worker(lambda: canvas.render_points(pytest_lib.get_points(radius), size, 0.5 * radius))
     self._worker.finished.connect(self.worker_done)
     self._worker.start()
 
   def worker_done(self):
     self._worker.wait()
-    pts = self._worker.get_result()
-    self.canvas.set_points(pts)
+    self.canvas.set_points_image(self._worker.get_result())
     self._worker = None
 
   def keyPressEvent(self, event):
@@ -106,9 +132,14 @@ class MyWindow(QMainWindow):
       self._worker.wait()
       self._worker = None
 
+    # still the placeholder label if closed before the viewer was created
+    if hasattr(self.mesh_viewer, "shutdown"):
+      self.mesh_viewer.shutdown()
+
 def main():
     app = QApplication(sys.argv)
     window = MyWindow()
+    startup_timing.mark("window created")
     window.show()
 
     return app.exec()
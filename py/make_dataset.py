@@ -0,0 +1,174 @@
+"""
+Generates a dataset of SH meshes on a process pool.
+
+    python py/make_dataset.py OUT_DIR --count 100000 --degree 3 --depth 4
+    python py/make_dataset.py OUT_DIR --coeffs coeffs.npy --depth 5
+    python py/make_dataset.py OUT_DIR --count 2000 --scaling 1,2,4,8,16
+
+The coefficient sets are split into shards of --shard-size meshes. Each worker writes its shard
+straight into .npy files with np.lib.format.open_memmap, so mesh data never goes through pickle;
+only (shard, count) comes back to the driver. A shard is committed by renaming its files into place
+and dropping a .done marker, rerunning the same command skips committed shards (resume).
+
+Output layout in OUT_DIR:
+    manifest.json                 generation parameters, checked on resume
+    indices.npy                   (M,) uint32, shared by all meshes (same depth => same topology)
+    shard_NNNNN.coeffs.npy        (k, (degree+1)^2) float32
+    shard_NNNNN.positions.npy     (k, N, 3) float32
+    shard_NNNNN.normals.npy       (k, N, 3) float32
+    shard_NNNNN.done
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+import pytest_lib
+
+def random_coeffs(seed, shard, count, degree):
+    """
+    Deterministic per shard, so a resumed run produces the same data. Band l is scaled by 1/(l+1)
+    to keep the shapes from being dominated by high frequencies.
+    """
+    rng = np.random.default_rng([seed, shard])
+    band = np.concatenate([np.full(2 * l + 1, 1.0 / (l + 1)) for l in range(degree + 1)])
+    return (rng.standard_normal((count, len(band))) * band).astype(np.float32)
+
+def _shard_path(out_dir, shard, kind):
+    return os.path.join(out_dir, f"shard_{shard:05d}.{kind}")
+
+def _run_shard(task):
+    out_dir, shard, start, stop, params = task
+
+    if params["coeffs"] is not None:
+        coeffs = np.load(params["coeffs"], mmap_mode="r")[start:stop].astype(np.float32)
+    else:
+        coeffs = random_coeffs(params["seed"], shard, stop - start, params["degree"])
+
+    k, n = len(coeffs), params["num_vertices"]
+
+    files = {}
+    arrays = {}
+    for kind, shape in (("positions", (k, n, 3)), ("normals", (k, n, 3)), ("coeffs", coeffs.shape)):
+        files[kind] = _shard_path(out_dir, shard, kind + ".tmp.npy")
+        arrays[kind] = np.lib.format.open_memmap(files[kind], mode="w+", dtype=np.float32, shape=shape)
+
+    arrays["coeffs"][:] = coeffs
+
+    for i, c in enumerate(coeffs):
+        pos, norm, _ = pytest_lib.create_mesh(params["depth"], c.tolist()).to_numpy()
+        arrays["positions"][i] = pos
+        arrays["normals"][i] = norm
+
+    for a in arrays.values():
+        a.flush()
+    arrays.clear()
+
+    for kind, tmp in files.items():
+        os.replace(tmp, _shard_path(out_dir, shard, kind + ".npy"))
+
+    open(_shard_path(out_dir, shard, "done"), "w").close()
+    return shard, k
+
+def _worker_ready(ready):
+    # runs after the worker has imported this module (numpy, pytest_lib)
+    ready.release()
+
+def _prepare(out_dir, params):
+    """
+    Writes manifest and shared indices, or checks them against an existing run.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    manifest_path = os.path.join(out_dir, "manifest.json")
+
+    _, _, indices = pytest_lib.create_mesh(params["depth"]).to_numpy()
+    params["num_vertices"] = int(indices.max()) + 1
+    params["num_indices"] = len(indices)
+
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            previous = json.load(f)
+        if previous != params:
+            sys.exit(f"{manifest_path} was written with different parameters, refusing to resume:\n"
+                     f"  previous: {previous}\n  now:      {params}")
+    else:
+        np.save(os.path.join(out_dir, "indices.npy"), indices)
+        with open(manifest_path, "w") as f:
+            json.dump(params, f, indent=2)
+
+def generate(out_dir, params, workers, quiet=False):
+    """
+    Runs all shards not yet committed in out_dir. Returns (meshes generated, seconds).
+    """
+    _prepare(out_dir, params)
+
+    count, shard_size = params["count"], params["shard_size"]
+    tasks = [(out_dir, shard, start, min(start + shard_size, count), params)
+             for shard, start in enumerate(range(0, count, shard_size))
+             if not os.path.exists(_shard_path(out_dir, shard, "done"))]
+
+    if not quiet and len(tasks) < -(-count // shard_size):
+        print(f"resuming, {len(tasks)} shards left")
+
+    done = 0
+
+    # spawn, not fork: the parent may already have started rayon's thread pool
+    ctx = multiprocessing.get_context("spawn")
+    ready = ctx.Semaphore(0)
+
+    with ctx.Pool(workers, initializer=_worker_ready, initargs=(ready,)) as pool:
+        # interpreter startup and imports in the workers are not part of the throughput
+        for _ in range(workers):
+            ready.acquire()
+        t0 = time.perf_counter()
+
+        for shard, k in pool.imap_unordered(_run_shard, tasks):
+            done += k
+            if not quiet:
+                dt = time.perf_counter() - t0
+                print(f"shard {shard:5d} done, {done}/{count} meshes this run, {done / dt:.1f} meshes/s")
+
+    return done, time.perf_counter() - t0
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("out_dir")
+    parser.add_argument("--count", type=int, default=1000, help="number of random meshes (ignored with --coeffs)")
+    parser.add_argument("--degree", type=int, default=2, help="SH degree of random coefficient sets")
+    parser.add_argument("--coeffs", help=".npy file with an (count, (degree+1)^2) coefficient array")
+    parser.add_argument("--depth", type=int, default=4, help="sphere subdivision depth")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--shard-size", type=int, default=64)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--scaling", help="comma separated worker counts: benchmark meshes/s into temporary directories")
+    args = parser.parse_args()
+
+    params = {"depth": args.depth, "shard_size": args.shard_size, "seed": args.seed, "coeffs": None}
+
+    if args.coeffs is not None:
+        coeffs = np.load(args.coeffs, mmap_mode="r")
+        params["coeffs"] = os.path.abspath(args.coeffs)
+        params["count"] = len(coeffs)
+        params["degree"] = int(np.sqrt(coeffs.shape[1])) - 1
+    else:
+        params["count"] = args.count
+        params["degree"] = args.degree
+
+    if args.scaling:
+        for workers in (int(w) for w in args.scaling.split(",")):
+            with tempfile.TemporaryDirectory(dir=args.out_dir if os.path.isdir(args.out_dir) else None) as tmp:
+                n, dt = generate(tmp, dict(params), workers, quiet=True)
+            print(f"workers={workers:3d}  {n} meshes in {dt:7.2f} s  {n / dt:9.1f} meshes/s")
+        return
+
+    n, dt = generate(args.out_dir, params, args.workers)
+    if n:
+        print(f"{n} meshes in {dt:.2f} s, {n / dt:.1f} meshes/s with {args.workers} workers")
+
+if __name__ == "__main__":
+    main()
@@ -74,3 +74,13 @@ def make_mesh_renderer(parent_entity: Qt3DCore.QEntity,
     geom_renderer.setPrimitiveType(Qt3DRender.QGeometryRenderer.Triangles)
 
     return geom_renderer
+
+def find_attribute(geom_renderer: Qt3DRender.QGeometryRenderer, name: str) -> Qt3DCore.QAttribute:
+    """
+    Returns the attribute called `name` of a renderer created by make_mesh_renderer.
+    """
+    for attr in geom_renderer.geometry().attributes():
+        if attr.name() == name:
+            return attr
+
+    raise KeyError(name)
@@ -16,11 +16,37 @@ from PySide6.Qt3DExtras import (Qt3DExtras)
 from PySide6 import QtWidgets, QtCore
 from PySide6.QtGui import QColor
 from PySide6.Qt3DRender import Qt3DRender
+from PySide6.Qt3DLogic import Qt3DLogic
 
 import orbit_controller
+import morph_controller
 import make_mesh
+import startup_timing
+from worker import Worker
+
+# coefficient sets (degree 2) the morph animation cycles through, the first one matches create_mesh
+MORPH_COEFF_SETS = [
+    [0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 0.0, 0.0],
+    [0.4, 0.0, 0.0, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0],
+    [0.3, 0.0, 0.5, 0.0, 0.8, 0.0, 0.0, 0.0, 0.0],
+]
+
+def _buildMesh():
+    """
+    Everything the viewer needs from pytest_lib, run off the GUI thread.
+    """
+    mesh = pytest_lib.create_mesh()
+    degree = int(np.sqrt(len(MORPH_COEFF_SETS[0]))) - 1
+
+    basis = pytest_lib.ShBasis(mesh, degree)
+    # one BVH per vertex buffer, each refitted together with its buffer
+    bvhs = [pytest_lib.Bvh(mesh), pytest_lib.Bvh(mesh)]
+
+    return mesh.to_numpy(), basis, bvhs
 
 class MeshViewer(QtWidgets.QWidget):
+    meshReady = Signal()
+
     def __init__(self):
         super().__init__()
         
@@ -31,9 +57,12 @@ class MeshViewer(QtWidgets.QWidget):
         container.setFixedSize(1024, 1024)
         container.setFocusPolicy(QtCore.Qt.StrongFocus)
 
-        layout = QtWidgets.QHBoxLayout(self)
+        self.hoverLabel = QtWidgets.QLabel("")
+
+        layout = QtWidgets.QVBoxLayout(self)
         layout.setContentsMargins(0, 0, 0, 0)
         layout.addWidget(container)
+        layout.addWidget(self.hoverLabel)
 
         # Camera
         w.camera().lens().setPerspectiveProjection(60, 1.0, 0.1, 100)
@@ -50,6 +79,31 @@ class MeshViewer(QtWidgets.QWidget):
         w.setRootEntity(self.rootEntity)
         self.window = w
 
+        # hover picking, the 3D window gets the mouse events, not the container
+        w.installEventFilter(self)
+        self._hoverPos = None
+
+        # the scene starts with a placeholder, the SH mesh is swapped in once built
+        self.morphController = None
+
+        # quitting (e.g. QApplication.quit()) does not close child widgets, so hook the app as well
+        QtWidgets.QApplication.instance().aboutToQuit.connect(self.shutdown)
+        self._meshBuilder = Worker(_buildMesh)
+        self._meshBuilder.finished.connect(self._onMeshBuilt)
+        self._meshBuilder.start()
+
+    def shutdown(self):
+        """
+        Stops the background threads, safe to call more than once.
+        """
+        # a QThread destroyed while running aborts the process, let the mesh build finish first
+        if self._meshBuilder is not None:
+            self._meshBuilder.wait()
+            self._meshBuilder = None
+
+        if self.morphController is not None:
+            self.morphController.stop()
+
     def createLight(self):
         light = Qt3DRender.QPointLight(self.rootEntity)
         light.setColor("white")
@@ -87,7 +141,10 @@ class MeshViewer(QtWidgets.QWidget):
       # Torus
       self.torusEntity = Qt3DCore.QEntity(self.rootEntity)
 
-      self.mesh = self._createMesh()
+      # placeholder drawn with the final material, so its shader program is compiled and
+      # linked during the first frames instead of when the real mesh arrives
+      self.mesh = Qt3DExtras.QSphereMesh(self.rootEntity)
+      self.mesh.setRadius(0.25)
       self.torusTransform = Qt3DCore.QTransform()
       self.torusTransform.setScale3D(QVector3D(2, 1, 2))
       self.torusTransform.setRotation(QQuaternion.fromAxisAndAngle(QVector3D(1, 0, 0), 45))
@@ -102,10 +159,111 @@ class MeshViewer(QtWidgets.QWidget):
 
         self.createLight()
         self.createTorus()
+        self.createHoverMarker()
         
         self.controller = self._makeController(self.torusTransform)
 
-
+        # fires once per rendered frame, used to time the first frame
+        self.frameAction = Qt3DLogic.QFrameAction(self.rootEntity)
+        self.frameAction.triggered.connect(self._onFrame)
+        # the mesh spins and morphs under a resting cursor, so the pick is redone every frame
+        self.frameAction.triggered.connect(self._onFrameHover)
+        self.rootEntity.addComponent(self.frameAction)
+
+    def _onFrame(self, dt):
+        startup_timing.mark("first 3D frame")
+        self.frameAction.triggered.disconnect(self._onFrame)
+
+    def _onFrameHover(self, dt):
+        if self._hoverPos is not None:
+            self._updateHover(self._hoverPos)
+
+    def _onMeshBuilt(self):
+        # already shut down, the queued finished signal arrives after shutdown() waited for the thread
+        if self._meshBuilder is None:
+            return
+
+        self._meshBuilder.wait()
+        (pos, norm, idxs), basis, bvhs = self._meshBuilder.get_result()
+        self._meshBuilder = None
+
+        renderer = make_mesh.make_mesh_renderer(self.rootEntity, pos, norm, idxs)
+        self.torusEntity.removeComponent(self.mesh)
+        self.torusEntity.addComponent(renderer)
+        self.mesh = renderer
+
+        self.morphController = self._makeMorphController(renderer, basis, bvhs)
+        self.meshReady.emit()
+
+
+
+    def createHoverMarker(self):
+        # child of the SH mesh, so the marker is placed in mesh space and follows its rotation
+        self.hoverEntity = Qt3DCore.QEntity(self.torusEntity)
+
+        mesh = Qt3DExtras.QSphereMesh(self.hoverEntity)
+        mesh.setRadius(0.02)
+        mat = Qt3DExtras.QPhongMaterial(self.hoverEntity)
+        mat.setAmbient(QColor(255, 255, 0))
+        self.hoverTransform = Qt3DCore.QTransform(self.hoverEntity)
+
+        self.hoverEntity.addComponent(mesh)
+        self.hoverEntity.addComponent(mat)
+        self.hoverEntity.addComponent(self.hoverTransform)
+        self.hoverEntity.setEnabled(False)
+
+    def eventFilter(self, obj, event):
+        if obj is self.window:
+            if event.type() == QtCore.QEvent.MouseMove:
+                self._hoverPos = event.position()
+                self._updateHover(self._hoverPos)
+            elif event.type() == QtCore.QEvent.Leave:
+                self._hoverPos = None
+                self._clearHover()
+
+        return False
+
+    def _pickRay(self, pos):
+        """
+        Ray through the window position `pos`, in the local space of the SH mesh.
+        Returns (origin, direction) as QVector3D.
+        """
+        cam = self.window.camera()
+        h = self.window.height()
+        viewport = QtCore.QRect(0, 0, self.window.width(), h)
+        model_view = cam.viewMatrix() * self.torusTransform.matrix()
+
+        # unproject expects GL window coords (y up)
+        x, y = pos.x(), h - pos.y()
+        near = QVector3D(x, y, 0.0).unproject(model_view, cam.projectionMatrix(), viewport)
+        far = QVector3D(x, y, 1.0).unproject(model_view, cam.projectionMatrix(), viewport)
+
+        return near, far - near
+
+    def _updateHover(self, pos):
+        if self.morphController is None:
+            return
+
+        origin, direction = self._pickRay(pos)
+        bvh, coeff = self.morphController.front()
+        hit = bvh.raycast((origin.x(), origin.y(), origin.z()),
+                          (direction.x(), direction.y(), direction.z()))
+
+        if hit is None:
+            self._clearHover()
+            return
+
+        t, tri, _, _ = hit
+        p = origin + direction * t
+        value = pytest_lib.sh_eval(p.x(), p.y(), p.z(), coeff.tolist())
+
+        self.hoverTransform.setTranslation(p)
+        self.hoverEntity.setEnabled(True)
+        self.hoverLabel.setText(f"triangle {tri}: SH({p.x():+.3f}, {p.y():+.3f}, {p.z():+.3f}) = {value:+.4f}")
+
+    def _clearHover(self):
+        self.hoverEntity.setEnabled(False)
+        self.hoverLabel.setText("")
 
     def cube_arrays(self, size: float = 1.0):
       """
@@ -173,19 +331,6 @@ class MeshViewer(QtWidgets.QWidget):
       return positions, normals, uvs, indices
 
 
-    def _createMesh(self):
-        mesh = pytest_lib.create_mesh()
-        pos, norm, idxs = mesh.to_numpy()
-
-        return make_mesh.make_mesh_renderer(self.rootEntity, pos, norm, idxs)
-        m = Qt3DExtras.QTorusMesh()
-        m.setRadius(5)
-        m.setMinorRadius(1)
-        m.setRings(100)
-        m.setSlices(20)
-
-        return m
-    
     def _makeController(self, xform):
         controller = orbit_controller.OrbitTransformController(xform)
         controller.setTarget(xform)
@@ -201,3 +346,17 @@ class MeshViewer(QtWidgets.QWidget):
         sphereRotateTransformAnimation.start()
 
         return controller
+
+    def _makeMorphController(self, renderer, basis, bvhs):
+        controller = morph_controller.MorphController(self, renderer, basis, MORPH_COEFF_SETS, bvhs)
+
+        morphAnimation = QPropertyAnimation(controller)
+        morphAnimation.setTargetObject(controller)
+        morphAnimation.setPropertyName(b"phase")
+        morphAnimation.setStartValue(0.0)
+        morphAnimation.setEndValue(float(len(MORPH_COEFF_SETS)))
+        morphAnimation.setDuration(3000 * len(MORPH_COEFF_SETS))
+        morphAnimation.setLoopCount(-1)
+        morphAnimation.start()
+
+        return controller
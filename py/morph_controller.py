@@ -0,0 +1,138 @@
+import threading
+
+import numpy as np
+from PySide6.QtCore import (Property, QByteArray, QObject, Signal)
+from PySide6.Qt3DCore import (Qt3DCore)
+
+import make_mesh
+
+class MorphController(QObject):
+    """
+    Morphs a mesh between SH coefficient sets. `phase` runs from 0 to len(coeffSets) and
+    interpolates linearly between consecutive sets (wrapping around), so a looping
+    QPropertyAnimation over it cycles through all of them.
+
+    Positions/normals are computed from a cached pytest_lib.ShBasis on a background thread
+    into the back buffer while Qt3D renders the front one; the buffers are swapped on the
+    GUI thread once a frame is ready. Requests arriving while a frame is being computed
+    are coalesced, only the latest phase gets computed.
+    """
+    def __init__(self, parent, renderer, basis, coeffSets, bvhs=None):
+        super().__init__(parent)
+        self._basis = basis
+        self._coeffSets = [np.asarray(c, dtype=np.float32) for c in coeffSets]
+        self._phase = 0
+
+        geom = renderer.geometry()
+        self._posAttr = make_mesh.find_attribute(renderer, Qt3DCore.QAttribute.defaultPositionAttributeName())
+        self._nrmAttr = make_mesh.find_attribute(renderer, Qt3DCore.QAttribute.defaultNormalAttributeName())
+
+        self._nbytes = 12 * self._posAttr.count()
+        # front = the buffers make_mesh_renderer created, back = a second pair of the same size
+        back_pos = Qt3DCore.QBuffer(geom)
+        back_nrm = Qt3DCore.QBuffer(geom)
+        for buf in (self._posAttr.buffer(), self._nrmAttr.buffer(), back_pos, back_nrm):
+            buf.setUsage(Qt3DCore.QBuffer.DynamicDraw)
+        self._buffers = [(self._posAttr.buffer(), self._nrmAttr.buffer()), (back_pos, back_nrm)]
+
+        # optional pair of BVHs (see pytest_lib.Bvh), refitted along with the buffers
+        self._bvhs = bvhs
+
+        self._front = 0
+        self._frontCoeff = self._coeffSets[0]
+        self._backCoeff = None
+        self._backPayload = None
+        self._requested = None
+        self._backReady = False
+        self._running = True
+        self._cond = threading.Condition()
+
+        self.frameReady.connect(self._swap)
+
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def coeffAt(self, phase):
+        n = len(self._coeffSets)
+        i = int(np.floor(phase)) % n
+        f = np.float32(phase - np.floor(phase))
+        return (1 - f) * self._coeffSets[i] + f * self._coeffSets[(i + 1) % n]
+
+    def front(self):
+        """
+        (bvh, coeff) matching what is currently displayed; bvh is None without BVHs.
+        """
+        bvh = self._bvhs[self._front] if self._bvhs else None
+        return bvh, self._frontCoeff
+
+    def stop(self):
+        """
+        Stops the worker thread and waits for it, must be called before the interpreter shuts down.
+        """
+        if not self._thread.is_alive():
+            return
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        self._thread.join()
+
+    def setPhase(self, phase):
+        if self._phase != phase:
+            self._phase = phase
+            with self._cond:
+                self._requested = phase
+                self._cond.notify_all()
+            self.phaseChanged.emit()
+
+    def getPhase(self):
+        return self._phase
+
+    def _run(self):
+        while True:
+            with self._cond:
+                # wait until the GUI thread has consumed the last frame and a new phase is requested
+                self._cond.wait_for(lambda: not self._running or (self._requested is not None and not self._backReady))
+                if not self._running:
+                    return
+                phase, self._requested = self._requested, None
+                back = 1 - self._front
+
+            coeff = self.coeffAt(phase)
+
+            # evaluate writes straight into the byte arrays that go to QBuffer.setData, so a frame is
+            # never copied; fresh ones each time, the previous pair is still shared with the buffers
+            payload = (QByteArray(self._nbytes, b"\0"), QByteArray(self._nbytes, b"\0"))
+            pos, nrm = (np.frombuffer(b, dtype=np.float32).reshape(-1, 3) for b in payload)
+            self._basis.evaluate(coeff.tolist(), pos, nrm)
+            if self._bvhs:
+                self._bvhs[back].refit(pos)
+            del pos, nrm
+
+            with self._cond:
+                self._backCoeff = coeff
+                self._backPayload = payload
+                self._backReady = True
+            self.frameReady.emit(back)
+
+    def _swap(self, back):
+        with self._cond:
+            if self._backPayload is None:
+                return
+            pos_data, nrm_data = self._backPayload
+            self._backPayload = None
+
+        pos_buf, nrm_buf = self._buffers[back]
+        pos_buf.setData(pos_data)
+        nrm_buf.setData(nrm_data)
+        self._posAttr.setBuffer(pos_buf)
+        self._nrmAttr.setBuffer(nrm_buf)
+
+        with self._cond:
+            self._front = back
+            self._frontCoeff = self._backCoeff
+            self._backReady = False
+            self._cond.notify_all()
+
+    frameReady = Signal(int)
+    phaseChanged = Signal()
+    phase = Property(float, getPhase, setPhase, notify=phaseChanged)
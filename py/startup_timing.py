@@ -0,0 +1,25 @@
+"""
+Startup timing marks. Import this first so the reference time is as close to process start as possible.
+
+Run `python py/main.py --startup-timing` to print the breakdown once the first mesh is shown.
+"""
+import sys
+import time
+
+_T0 = time.perf_counter()
+_marks = []
+
+enabled = "--startup-timing" in sys.argv
+
+def mark(name):
+    """Records `name` at the current time, only the first call per name counts."""
+    if all(n != name for n, _ in _marks):
+        _marks.append((name, time.perf_counter() - _T0))
+
+def report():
+    lines = ["startup timing (ms since process start):"]
+    prev = 0.0
+    for name, t in _marks:
+        lines.append(f"  {name:<16} {t * 1000:8.1f}  (+{(t - prev) * 1000:.1f})")
+        prev = t
+    return "\n".join(lines)
@@ -0,0 +1,12 @@
+from PySide6.QtCore import QThread
+
+class Worker(QThread):
+  def __init__(self, f):
+    super().__init__()
+    self._f = f
+
+  def run(self):
+    self._result = self._f()
+
+  def get_result(self):
+    return self._result
@@ -0,0 +1,419 @@
+use glam::Vec3;
+use numpy::{IntoPyArray, PyArray1, PyReadonlyArray2};
+use pyo3::exceptions::PyValueError;
+use pyo3::{Bound, PyRef, PyResult, Python, pyclass, pymethods};
+use rayon::prelude::*;
+
+use crate::mesh::Mesh;
+
+// SAH parameters
+const BINS          : usize = 16;
+const MAX_LEAF_SIZE : usize = 4;
+const TRAVERSAL_COST: f32   = 1.0;
+
+// subtrees smaller than this are built on the current thread
+const PAR_THRESHOLD : usize = 4096;
+
+// traversal keeps at most one pending sibling per level, so the depth cap bounds the stack
+const MAX_DEPTH     : usize = 48;
+const STACK_SIZE    : usize = MAX_DEPTH + 2;
+
+
+#[derive(Debug,Clone,Copy)]
+struct Aabb {
+  min : Vec3,
+  max : Vec3,
+}
+
+impl Aabb {
+  const EMPTY : Aabb = Aabb { min: Vec3::INFINITY, max: Vec3::NEG_INFINITY };
+
+  fn of_tri(t : &[Vec3; 3]) -> Self {
+    Aabb { min: t[0].min(t[1]).min(t[2]), max: t[0].max(t[1]).max(t[2]) }
+  }
+
+  fn union(self, o : Aabb) -> Self {
+    Aabb { min: self.min.min(o.min), max: self.max.max(o.max) }
+  }
+
+  fn grow(self, p : Vec3) -> Self {
+    Aabb { min: self.min.min(p), max: self.max.max(p) }
+  }
+
+  fn area(&self) -> f32 {
+    let e = self.max - self.min;
+    if e.x < 0.0 { return 0.0 }
+    2.0 * (e.x * e.y + e.y * e.z + e.z * e.x)
+  }
+
+  fn centroid(&self) -> Vec3 {
+    0.5 * (self.min + self.max)
+  }
+
+  /// slab test, returns the entry distance if the box is hit within [0, t_max)
+  fn hit(&self, origin : Vec3, inv_dir : Vec3, t_max : f32) -> Option<f32> {
+    let t0 = (self.min - origin) * inv_dir;
+    let t1 = (self.max - origin) * inv_dir;
+
+    let t_near = t0.min(t1).max_element().max(0.0);
+    let t_far  = t0.max(t1).min_element().min(t_max);
+
+    if t_near <= t_far { Some(t_near) } else { None }
+  }
+}
+
+/// Flattened node. Inner nodes store their left child at `idx + 1` and the right child in `offset`,
+/// leaves store the range [offset, offset + count) into the triangle arrays.
+#[derive(Debug,Clone,Copy)]
+struct Node {
+  bounds : Aabb,
+  offset : u32,
+  count  : u32,
+}
+
+#[derive(Clone,Copy)]
+struct PrimRef {
+  bounds   : Aabb,
+  centroid : Vec3,
+  tri      : u32,
+}
+
+enum BuildNode {
+  Leaf  { bounds : Aabb, first : usize, count : usize },
+  Inner { bounds : Aabb, left : Box<BuildNode>, right : Box<BuildNode> },
+}
+
+
+fn bin_of(c : f32, lo : f32, scale : f32) -> usize {
+  (((c - lo) * scale) as usize).min(BINS - 1)
+}
+
+/// binned SAH split, returns (axis, bin, cost) so that prims with bin < split go left
+fn find_split(refs : &[PrimRef], bounds : &Aabb, centroid_bounds : &Aabb) -> Option<(usize, usize, f32)> {
+  let mut best : Option<(usize, usize, f32)> = None;
+
+  for axis in 0..3 {
+    let lo = centroid_bounds.min[axis];
+    let extent = centroid_bounds.max[axis] - lo;
+    if extent <= 0.0 { continue }
+
+    let scale = BINS as f32 / extent;
+
+    let mut counts = [0usize; BINS];
+    let mut boxes  = [Aabb::EMPTY; BINS];
+
+    for r in refs {
+      let b = bin_of(r.centroid[axis], lo, scale);
+      counts[b] += 1;
+      boxes[b] = boxes[b].union(r.bounds);
+    }
+
+    // sweep from the right to get the right-hand areas, then from the left to evaluate the cost
+    let mut right_area  = [0.0f32; BINS];
+    let mut right_count = [0usize; BINS];
+    let mut acc = Aabb::EMPTY;
+    let mut n = 0;
+
+    for b in (1..BINS).rev() {
+      acc = acc.union(boxes[b]);
+      n += counts[b];
+      right_area[b]  = acc.area();
+      right_count[b] = n;
+    }
+
+    let mut acc = Aabb::EMPTY;
+    let mut n = 0;
+
+    for b in 1..BINS {
+      acc = acc.union(boxes[b - 1]);
+      n += counts[b - 1];
+
+      if n == 0 || right_count[b] == 0 { continue }
+
+      let cost = TRAVERSAL_COST + (n as f32 * acc.area() + right_count[b] as f32 * right_area[b]) / bounds.area().max(f32::MIN_POSITIVE);
+
+      if best.map_or(true, |(_, _, c)| cost < c) {
+        best = Some((axis, b, cost));
+      }
+    }
+  }
+
+  best
+}
+
+fn build_rec(refs : &mut [PrimRef], first : usize, depth : usize) -> BuildNode {
+  let bounds          = refs.iter().fold(Aabb::EMPTY, |acc, r| acc.union(r.bounds));
+  let centroid_bounds = refs.iter().fold(Aabb::EMPTY, |acc, r| acc.grow(r.centroid));
+  let count = refs.len();
+
+  // very unbalanced SAH splits can get deep, whatever is left at the cap becomes one (large) leaf
+  if count <= 2 || depth >= MAX_DEPTH {
+    return BuildNode::Leaf { bounds, first, count };
+  }
+
+  let split = find_split(refs, &bounds, &centroid_bounds);
+
+  let mid = match split {
+    Some((_, _, cost)) if count <= MAX_LEAF_SIZE && cost >= count as f32 => {
+      return BuildNode::Leaf { bounds, first, count };
+    }
+    Some((axis, bin, _)) => {
+      let lo = centroid_bounds.min[axis];
+      let scale = BINS as f32 / (centroid_bounds.max[axis] - lo);
+
+      let mut i = 0;
+      for j in 0..count {
+        if bin_of(refs[j].centroid[axis], lo, scale) < bin {
+          refs.swap(i, j);
+          i += 1;
+        }
+      }
+
+      i
+    }
+    None if count <= MAX_LEAF_SIZE => {
+      return BuildNode::Leaf { bounds, first, count };
+    }
+    // all centroids coincide, just cut the range in half
+    None => count / 2,
+  };
+
+  let (l, r) = refs.split_at_mut(mid);
+
+  let (left, right) = if count > PAR_THRESHOLD {
+    rayon::join(|| build_rec(l, first, depth + 1), || build_rec(r, first + mid, depth + 1))
+  } else {
+    (build_rec(l, first, depth + 1), build_rec(r, first + mid, depth + 1))
+  };
+
+  BuildNode::Inner { bounds, left: Box::new(left), right: Box::new(right) }
+}
+
+fn flatten(n : &BuildNode, nodes : &mut Vec<Node>) -> u32 {
+  let idx = nodes.len();
+  nodes.push(Node { bounds: Aabb::EMPTY, offset: 0, count: 0 });
+
+  nodes[idx] = match n {
+    BuildNode::Leaf { bounds, first, count } => {
+      Node { bounds: *bounds, offset: *first as u32, count: *count as u32 }
+    }
+    BuildNode::Inner { bounds, left, right } => {
+      flatten(left, nodes);
+      let r = flatten(right, nodes);
+      Node { bounds: *bounds, offset: r, count: 0 }
+    }
+  };
+
+  idx as u32
+}
+
+/// Möller-Trumbore, returns (t, u, v)
+fn intersect_tri(t : &[Vec3; 3], origin : Vec3, dir : Vec3) -> Option<(f32, f32, f32)> {
+  let e1 = t[1] - t[0];
+  let e2 = t[2] - t[0];
+
+  let p = dir.cross(e2);
+  let det = e1.dot(p);
+  if det.abs() < 1e-12 { return None }
+
+  let inv_det = 1.0 / det;
+  let s = origin - t[0];
+  let u = s.dot(p) * inv_det;
+  if !(0.0..=1.0).contains(&u) { return None }
+
+  let q = s.cross(e1);
+  let v = dir.dot(q) * inv_det;
+  if v < 0.0 || u + v > 1.0 { return None }
+
+  let dist = e2.dot(q) * inv_det;
+  if dist < 0.0 { return None }
+
+  Some((dist, u, v))
+}
+
+
+/// Bounding volume hierarchy over the triangles of a Mesh.
+#[pyclass]
+pub struct Bvh {
+  nodes    : Vec<Node>,
+
+  // triangle data in BVH leaf order
+  tris     : Vec<[Vec3; 3]>,
+  tri_vtx  : Vec<[u32; 3]>,
+  tri_ids  : Vec<u32>,
+
+  num_vertices : usize,
+}
+
+impl Bvh {
+  pub fn build(m : &Mesh) -> Self {
+    let mut refs : Vec<PrimRef> = m.indices.par_chunks_exact(3).enumerate().map(|(i, t)| {
+      let bounds = Aabb::of_tri(&[m.get(t[0]).pos, m.get(t[1]).pos, m.get(t[2]).pos]);
+      PrimRef { bounds, centroid: bounds.centroid(), tri: i as u32 }
+    }).collect();
+
+    let mut nodes = Vec::with_capacity(2 * refs.len() / MAX_LEAF_SIZE + 1);
+
+    if !refs.is_empty() {
+      let root = build_rec(&mut refs, 0, 0);
+      flatten(&root, &mut nodes);
+    }
+
+    let tri_ids : Vec<u32> = refs.iter().map(|r| r.tri).collect();
+
+    let tri_vtx : Vec<[u32; 3]> = tri_ids.iter().map(|&i| {
+      let t = &m.indices[3 * i as usize..3 * i as usize + 3];
+      [t[0], t[1], t[2]]
+    }).collect();
+
+    let tris = tri_vtx.iter().map(|t| [m.get(t[0]).pos, m.get(t[1]).pos, m.get(t[2]).pos]).collect();
+
+    Self { nodes, tris, tri_vtx, tri_ids, num_vertices: m.vertices.len() }
+  }
+
+  /// closest hit as (t, triangle index, u, v)
+  pub fn intersect(&self, origin : Vec3, dir : Vec3) -> Option<(f32, u32, f32, f32)> {
+    if self.nodes.is_empty() { return None }
+
+    let inv_dir = dir.recip();
+    let mut best : Option<(f32, u32, f32, f32)> = None;
+    let mut t_max = f32::INFINITY;
+
+    let mut stack = [0u32; STACK_SIZE];
+    let mut sp = 1;
+
+    while sp > 0 {
+      sp -= 1;
+      let node = &self.nodes[stack[sp] as usize];
+
+      if node.bounds.hit(origin, inv_dir, t_max).is_none() { continue }
+
+      if node.count > 0 {
+        let range = node.offset as usize..(node.offset + node.count) as usize;
+
+        for k in range {
+          if let Some((t, u, v)) = intersect_tri(&self.tris[k], origin, dir) {
+            if t < t_max {
+              t_max = t;
+              best = Some((t, self.tri_ids[k], u, v));
+            }
+          }
+        }
+
+        continue;
+      }
+
+      // visit the nearer child first
+      let l = stack[sp] + 1;
+      let r = node.offset;
+      let tl = self.nodes[l as usize].bounds.hit(origin, inv_dir, t_max);
+      let tr = self.nodes[r as usize].bounds.hit(origin, inv_dir, t_max);
+
+      match (tl, tr) {
+        (Some(a), Some(b)) => {
+          let (near, far) = if a <= b { (l, r) } else { (r, l) };
+          stack[sp] = far;
+          stack[sp + 1] = near;
+          sp += 2;
+        }
+        (Some(_), None) => { stack[sp] = l; sp += 1; }
+        (None, Some(_)) => { stack[sp] = r; sp += 1; }
+        (None, None)    => {}
+      }
+    }
+
+    best
+  }
+
+  /// Recomputes all bounds for new vertex positions, keeping the tree topology.
+  pub fn refit_positions(&mut self, pos : &[f32]) {
+    let p = |i : u32| Vec3::from_slice(&pos[3 * i as usize..]);
+
+    self.tris.par_iter_mut().zip(self.tri_vtx.par_iter()).for_each(|(t, v)| {
+      *t = [p(v[0]), p(v[1]), p(v[2])];
+    });
+
+    // children always come after their parent, so a reverse sweep is bottom-up
+    for idx in (0..self.nodes.len()).rev() {
+      let n = self.nodes[idx];
+
+      self.nodes[idx].bounds = if n.count > 0 {
+        self.tris[n.offset as usize..(n.offset + n.count) as usize].iter()
+          .fold(Aabb::EMPTY, |acc, t| acc.union(Aabb::of_tri(t)))
+      } else {
+        self.nodes[idx + 1].bounds.union(self.nodes[n.offset as usize].bounds)
+      };
+    }
+  }
+}
+
+/// flat xyz slice of a C-contiguous (N,3) array
+fn as_vec3_rows<'a>(a : &'a PyReadonlyArray2<'_, f32>, name : &str) -> PyResult<&'a [f32]> {
+  if a.shape()[1] != 3 {
+    return Err(PyValueError::new_err(format!("{name} must have shape (N, 3)")));
+  }
+
+  a.as_slice().map_err(|_| PyValueError::new_err(format!("{name} must be C-contiguous")))
+}
+
+#[pymethods]
+impl Bvh {
+  #[new]
+  fn new(py: Python<'_>, mesh: PyRef<'_, Mesh>) -> Self {
+    let mesh : &Mesh = &mesh;
+    py.detach(|| Bvh::build(mesh))
+  }
+
+  /// Closest hit along origin + t * dir as (t, triangle index, u, v), or None.
+  fn raycast(&self, origin: [f32; 3], dir: [f32; 3]) -> Option<(f32, u32, f32, f32)> {
+    self.intersect(Vec3::from_array(origin), Vec3::from_array(dir))
+  }
+
+  /// Batched raycast for (N,3) float32 origins/directions.
+  /// Returns (t, triangle, u, v) arrays; misses have t = inf and triangle = -1.
+  fn raycast_batch<'py>(&self, py: Python<'py>, origins: PyReadonlyArray2<'py, f32>, dirs: PyReadonlyArray2<'py, f32>)
+    -> PyResult<(Bound<'py, PyArray1<f32>>, Bound<'py, PyArray1<i64>>, Bound<'py, PyArray1<f32>>, Bound<'py, PyArray1<f32>>)>
+  {
+    let o = as_vec3_rows(&origins, "origins")?;
+    let d = as_vec3_rows(&dirs, "dirs")?;
+
+    if o.len() != d.len() {
+      return Err(PyValueError::new_err("origins and dirs must have the same length"));
+    }
+
+    let hits : Vec<_> = py.detach(|| {
+      o.par_chunks_exact(3).zip(d.par_chunks_exact(3))
+        .map(|(o, d)| self.intersect(Vec3::from_slice(o), Vec3::from_slice(d)))
+        .collect()
+    });
+
+    let t   = hits.iter().map(|h| h.map_or(f32::INFINITY, |h| h.0)).collect::<Vec<_>>();
+    let tri = hits.iter().map(|h| h.map_or(-1, |h| h.1 as i64)).collect::<Vec<_>>();
+    let u   = hits.iter().map(|h| h.map_or(0.0, |h| h.2)).collect::<Vec<_>>();
+    let v   = hits.iter().map(|h| h.map_or(0.0, |h| h.3)).collect::<Vec<_>>();
+
+    Ok((t.into_pyarray(py), tri.into_pyarray(py), u.into_pyarray(py), v.into_pyarray(py)))
+  }
+
+  /// Refits the tree in place to new (N,3) float32 vertex positions with unchanged topology.
+  fn refit(&mut self, py: Python<'_>, positions: PyReadonlyArray2<'_, f32>) -> PyResult<()> {
+    let pos = as_vec3_rows(&positions, "positions")?;
+
+    if pos.len() != 3 * self.num_vertices {
+      return Err(PyValueError::new_err(format!("expected {} positions, got {}", self.num_vertices, pos.len() / 3)));
+    }
+
+    py.detach(|| self.refit_positions(pos));
+    Ok(())
+  }
+
+  #[getter]
+  fn num_nodes(&self) -> usize {
+    self.nodes.len()
+  }
+
+  #[getter]
+  fn num_triangles(&self) -> usize {
+    self.tris.len()
+  }
+}
@@ -0,0 +1,235 @@
+use std::ffi::OsString;
+use std::fs::File;
+use std::io;
+use std::path::{Path, PathBuf};
+
+use glam::Vec3;
+use memmap2::MmapMut;
+use pyo3::pyclass;
+use rayon::prelude::*;
+
+use crate::spherical_harmonics::{OCTAHEDRON_TRIS, OCTAHEDRON_VERTICES, sh_value_func};
+
+// pos xyz + normal xyz as little-endian f32
+const VERTEX_SIZE : usize = 24;
+const TRI_SIZE    : usize = 12;
+
+// 4 * 4^depth + 2 vertices have to fit into u32 indices
+pub const MAX_DEPTH : u32 = 14;
+
+
+/// Result of generate(): the two files plus the layout needed to read them back.
+/// Vertices are (num_vertices, 6) f32 [pos, normal], indices are (num_triangles, 3) u32.
+/// Each octant of the octahedron is one patch, a contiguous range of triangles.
+#[pyclass]
+pub struct ChunkedMesh {
+  #[pyo3(get)]
+  pub vertex_path   : PathBuf,
+  #[pyo3(get)]
+  pub index_path    : PathBuf,
+  #[pyo3(get)]
+  pub depth         : u32,
+  #[pyo3(get)]
+  pub num_vertices  : usize,
+  #[pyo3(get)]
+  pub num_triangles : usize,
+  /// (first triangle, triangle count) per patch
+  #[pyo3(get)]
+  pub patches       : Vec<(usize, usize)>,
+}
+
+/// Global vertex numbering of the subdivided octahedron. Every octant is a triangular lattice with
+/// n = 2^depth segments per edge, lattice point (i, j) sits at a*(n-i-j) + b*i + c*j projected onto
+/// the sphere. Vertices shared between octants are numbered once:
+///
+///   [6 corners | 12 edges x (n-1) | 8 octants x (n-1)(n-2)/2 interior vertices]
+///
+/// so every octant can be written independently and the seams still agree.
+struct Lattice {
+  n             : usize,
+  edges         : Vec<(u32, u32)>,
+  interior      : usize,
+  interior_base : usize,
+  row_offset    : Vec<usize>,
+}
+
+impl Lattice {
+  fn new(n : usize) -> Self {
+    let mut edges : Vec<(u32, u32)> = OCTAHEDRON_TRIS.iter()
+      .flat_map(|&(a, b, c)| [(a, b), (b, c), (c, a)])
+      .map(|(u, v)| (u.min(v), u.max(v)))
+      .collect();
+    edges.sort();
+    edges.dedup();
+
+    // interior row j (1 <= j <= n-2) holds i = 1..n-1-j
+    let mut row_offset = vec![0; n.max(2)];
+    for j in 1..n.saturating_sub(1) {
+      row_offset[j + 1] = row_offset[j] + (n - 1 - j);
+    }
+
+    let interior = n.saturating_sub(1) * n.saturating_sub(2) / 2;
+
+    Self { n, interior, interior_base: 6 + edges.len() * (n - 1), edges, row_offset }
+  }
+
+  /// vertex k (0 < k < n) on the edge u -> v
+  fn edge_vertex(&self, u : u32, v : u32, k : usize) -> usize {
+    let (key, k) = if u < v { ((u, v), k) } else { ((v, u), self.n - k) };
+    let e = self.edges.iter().position(|&p| p == key).unwrap();
+
+    6 + e * (self.n - 1) + k - 1
+  }
+
+  fn vertex(&self, octant : usize, i : usize, j : usize) -> u32 {
+    let (a, b, c) = OCTAHEDRON_TRIS[octant];
+    let n = self.n;
+
+    let idx = if j == 0 {
+      if i == 0 { a as usize } else if i == n { b as usize } else { self.edge_vertex(a, b, i) }
+    } else if i == 0 {
+      if j == n { c as usize } else { self.edge_vertex(a, c, j) }
+    } else if i + j == n {
+      self.edge_vertex(b, c, j)
+    } else {
+      self.interior_base + octant * self.interior + self.row_offset[j] + i - 1
+    };
+
+    idx as u32
+  }
+}
+
+fn lattice_dir(a : Vec3, b : Vec3, c : Vec3, n : usize, i : usize, j : usize) -> Vec3 {
+  (a * (n - i - j) as f32 + b * i as f32 + c * j as f32).normalize()
+}
+
+fn put_vertex(buf : &mut [u8], dir : Vec3, value : &impl Fn(f32, f32, f32) -> f32) {
+  let p = dir * value(dir.x, dir.y, dir.z).abs();
+
+  for (k, f) in [p.x, p.y, p.z, dir.x, dir.y, dir.z].into_iter().enumerate() {
+    buf[k*4..k*4+4].copy_from_slice(&f.to_le_bytes());
+  }
+}
+
+fn put_tri(buf : &mut [u8], t : [u32; 3]) {
+  for (k, idx) in t.into_iter().enumerate() {
+    buf[k*4..k*4+4].copy_from_slice(&idx.to_le_bytes());
+  }
+}
+
+/// cuts `buf` into consecutive pieces of the given lengths
+fn split_rows<'a>(mut buf : &'a mut [u8], lens : impl Iterator<Item = usize>) -> Vec<&'a mut [u8]> {
+  let mut rows = Vec::new();
+
+  for len in lens {
+    let (head, tail) = std::mem::take(&mut buf).split_at_mut(len);
+    rows.push(head);
+    buf = tail;
+  }
+
+  rows
+}
+
+fn map_file(path : &Path, len : usize) -> io::Result<MmapMut> {
+  let f = File::options().read(true).write(true).create(true).truncate(true).open(path)?;
+  f.set_len(len as u64)?;
+
+  unsafe { MmapMut::map_mut(&f) }
+}
+
+fn with_suffix(path : &Path, suffix : &str) -> PathBuf {
+  let mut s = OsString::from(path.as_os_str());
+  s.push(suffix);
+  s.into()
+}
+
+/// Writes the SH-displaced sphere of the given depth to `<prefix>.vtx` / `<prefix>.idx`.
+/// Nothing proportional to the mesh size is held in memory, all data goes straight into the mapped files.
+pub fn generate(prefix : &Path, depth : u32, coeff : &[f32]) -> io::Result<ChunkedMesh> {
+  if depth > MAX_DEPTH {
+    return Err(io::Error::new(io::ErrorKind::InvalidInput, format!("depth must be <= {MAX_DEPTH}")));
+  }
+
+  let n = 1usize << depth;
+  let lat = Lattice::new(n);
+
+  let num_vertices  = 4 * n * n + 2;
+  let num_triangles = 8 * n * n;
+
+  let vertex_path = with_suffix(prefix, ".vtx");
+  let index_path  = with_suffix(prefix, ".idx");
+
+  let mut vtx = map_file(&vertex_path, num_vertices * VERTEX_SIZE)?;
+  let mut idx = map_file(&index_path, num_triangles * TRI_SIZE)?;
+
+  let (skeleton, interiors) = vtx.split_at_mut(lat.interior_base * VERTEX_SIZE);
+
+  // corners and edges, shared by several octants
+  let value = sh_value_func(coeff);
+
+  for (k, p) in OCTAHEDRON_VERTICES.into_iter().enumerate() {
+    put_vertex(&mut skeleton[k * VERTEX_SIZE..], p, &value);
+  }
+
+  for &(u, v) in lat.edges.iter() {
+    let (pu, pv) = (OCTAHEDRON_VERTICES[u as usize], OCTAHEDRON_VERTICES[v as usize]);
+
+    for k in 1..n {
+      let d = lattice_dir(pu, pv, Vec3::ZERO, n, k, 0);
+      put_vertex(&mut skeleton[lat.edge_vertex(u, v, k) * VERTEX_SIZE..], d, &value);
+    }
+  }
+
+  // octant interiors, one task per lattice row
+  let mut vtx_rows = Vec::new();
+
+  if lat.interior > 0 {
+    for (o, chunk) in interiors.chunks_mut(lat.interior * VERTEX_SIZE).enumerate() {
+      let rows = split_rows(chunk, (1..n - 1).map(|j| (n - 1 - j) * VERTEX_SIZE));
+      vtx_rows.extend(rows.into_iter().enumerate().map(|(r, row)| (o, r + 1, row)));
+    }
+  }
+
+  vtx_rows.into_par_iter().for_each(|(o, j, row)| {
+    let value = sh_value_func(coeff);
+    let (a, b, c) = OCTAHEDRON_TRIS[o];
+    let (a, b, c) = (OCTAHEDRON_VERTICES[a as usize], OCTAHEDRON_VERTICES[b as usize], OCTAHEDRON_VERTICES[c as usize]);
+
+    for i in 1..n - j {
+      put_vertex(&mut row[(i - 1) * VERTEX_SIZE..], lattice_dir(a, b, c, n, i, j), &value);
+    }
+  });
+
+  // triangles, lattice row j holds n-j upward and n-j-1 downward triangles
+  let mut tri_rows = Vec::new();
+
+  for (o, chunk) in idx.chunks_mut(n * n * TRI_SIZE).enumerate() {
+    let rows = split_rows(chunk, (0..n).map(|j| (2 * (n - j) - 1) * TRI_SIZE));
+    tri_rows.extend(rows.into_iter().enumerate().map(|(j, row)| (o, j, row)));
+  }
+
+  tri_rows.into_par_iter().for_each(|(o, j, row)| {
+    let v = |i, j| lat.vertex(o, i, j);
+    let mut out = row.chunks_exact_mut(TRI_SIZE);
+
+    for i in 0..n - j {
+      put_tri(out.next().unwrap(), [v(i, j), v(i + 1, j), v(i, j + 1)]);
+
+      if i + 1 < n - j {
+        put_tri(out.next().unwrap(), [v(i + 1, j), v(i + 1, j + 1), v(i, j + 1)]);
+      }
+    }
+  });
+
+  vtx.flush()?;
+  idx.flush()?;
+
+  Ok(ChunkedMesh {
+    vertex_path,
+    index_path,
+    depth,
+    num_vertices,
+    num_triangles,
+    patches: (0..OCTAHEDRON_TRIS.len()).map(|o| (o * n * n, n * n)).collect(),
+  })
+}
@@ -0,0 +1,214 @@
+use std::fs::File;
+use std::io::{self, BufWriter, Write};
+use std::path::PathBuf;
+
+use glam::Vec3;
+use pyo3::exceptions::PyTypeError;
+use pyo3::types::{PyAnyMethods, PyBytes};
+use pyo3::{Bound, Py, PyAny, PyErr, PyResult, Python};
+
+use crate::mesh::{Mesh, Vertex};
+
+// size of the chunks handed to the OS / the python writer
+const CHUNK_SIZE : usize = 1 << 20;
+
+
+/// io::Write adapter around a python object with a `write(bytes)` method.
+/// The GIL is only taken for the duration of a single chunk.
+struct PyWriter(Py<PyAny>);
+
+impl Write for PyWriter {
+  fn write(&mut self, buf: &[u8]) -> io::Result<usize> {
+    Python::attach(|py| {
+      let n = self.0.bind(py).call_method1("write", (PyBytes::new(py, buf),))?;
+
+      // raw streams return the number of bytes written, text-ish ones may return None
+      if n.is_none() { Ok(buf.len()) } else { n.extract::<usize>() }
+    }).map_err(io::Error::other)
+  }
+
+  fn flush(&mut self) -> io::Result<()> {
+    Python::attach(|py| {
+      let obj = self.0.bind(py);
+
+      if obj.hasattr("flush")? {
+        obj.call_method0("flush")?;
+      }
+
+      Ok(())
+    }).map_err(io::Error::other)
+  }
+}
+
+fn to_pyerr(e : io::Error) -> PyErr {
+  // hand python exceptions raised by the writer back unchanged
+  if e.get_ref().is_some_and(|inner| inner.is::<PyErr>()) {
+    return *e.into_inner().unwrap().downcast::<PyErr>().unwrap();
+  }
+
+  PyErr::from(e)
+}
+
+/// Runs `f` with the GIL released, writing either to a file (if `target` is a str / os.PathLike)
+/// or to any python object providing `write`.
+pub fn with_target<F>(py: Python<'_>, target: &Bound<'_, PyAny>, f: F) -> PyResult<()>
+where F: FnOnce(&mut dyn Write) -> io::Result<()> + Send
+{
+  if let Ok(path) = target.extract::<PathBuf>() {
+    return py.detach(|| {
+      let mut w = BufWriter::with_capacity(CHUNK_SIZE, File::create(path)?);
+      f(&mut w)?;
+      w.flush()
+    }).map_err(to_pyerr);
+  }
+
+  if !target.hasattr("write")? {
+    return Err(PyTypeError::new_err("target must be a path or an object with a write() method"));
+  }
+
+  let mut w = BufWriter::with_capacity(CHUNK_SIZE, PyWriter(target.clone().unbind()));
+
+  let res = py.detach(|| {
+    f(&mut w)?;
+    w.flush()
+  });
+
+  // BufWriter flushes on drop, which would hand the rest of a failed export to the writer
+  if res.is_err() {
+    let _ = w.into_parts();
+  }
+
+  res.map_err(to_pyerr)
+}
+
+
+fn vertex_bytes(v : &Vertex) -> [u8; 24] {
+  let mut b = [0u8; 24];
+
+  for (i, f) in [v.pos.x, v.pos.y, v.pos.z, v.norm.x, v.norm.y, v.norm.z].into_iter().enumerate() {
+    b[i*4..i*4+4].copy_from_slice(&f.to_le_bytes());
+  }
+
+  b
+}
+
+fn vec3_bytes(v : Vec3) -> [u8; 12] {
+  let mut b = [0u8; 12];
+  b[0..4].copy_from_slice(&v.x.to_le_bytes());
+  b[4..8].copy_from_slice(&v.y.to_le_bytes());
+  b[8..12].copy_from_slice(&v.z.to_le_bytes());
+  b
+}
+
+/// binary little-endian PLY with per-vertex normals
+pub fn write_ply(m : &Mesh, w : &mut dyn Write) -> io::Result<()> {
+  write!(w,
+    "ply\n\
+     format binary_little_endian 1.0\n\
+     element vertex {}\n\
+     property float x\nproperty float y\nproperty float z\n\
+     property float nx\nproperty float ny\nproperty float nz\n\
+     element face {}\n\
+     property list uchar uint vertex_indices\n\
+     end_header\n",
+    m.vertices.len(), m.indices.len() / 3)?;
+
+  for v in m.vertices.iter() {
+    w.write_all(&vertex_bytes(v))?;
+  }
+
+  for tri in m.indices.chunks_exact(3) {
+    let mut b = [3u8; 13];
+    b[1..5].copy_from_slice(&tri[0].to_le_bytes());
+    b[5..9].copy_from_slice(&tri[1].to_le_bytes());
+    b[9..13].copy_from_slice(&tri[2].to_le_bytes());
+    w.write_all(&b)?;
+  }
+
+  Ok(())
+}
+
+/// Wavefront OBJ (positions + normals, 1-based indices)
+pub fn write_obj(m : &Mesh, w : &mut dyn Write) -> io::Result<()> {
+  for v in m.vertices.iter() {
+    write!(w, "v {} {} {}\n", v.pos.x, v.pos.y, v.pos.z)?;
+  }
+
+  for v in m.vertices.iter() {
+    write!(w, "vn {} {} {}\n", v.norm.x, v.norm.y, v.norm.z)?;
+  }
+
+  for tri in m.indices.chunks_exact(3) {
+    let (a, b, c) = (tri[0] + 1, tri[1] + 1, tri[2] + 1);
+    write!(w, "f {a}//{a} {b}//{b} {c}//{c}\n")?;
+  }
+
+  Ok(())
+}
+
+/// glTF 2.0 binary container: one mesh, one primitive with POSITION/NORMAL and u32 indices.
+/// The BIN chunk is laid out as [positions | normals | indices].
+pub fn write_glb(m : &Mesh, w : &mut dyn Write) -> io::Result<()> {
+  // glTF requires count and byteLength >= 1
+  if m.vertices.is_empty() || m.indices.is_empty() {
+    return Err(io::Error::new(io::ErrorKind::InvalidInput, "cannot write an empty mesh as GLB"));
+  }
+
+  let n = m.vertices.len();
+  let (min, max) = m.vertices.iter()
+    .fold((Vec3::INFINITY, Vec3::NEG_INFINITY), |(lo, hi), v| (lo.min(v.pos), hi.max(v.pos)));
+
+  let attr_len = n * 12;
+  let idx_len  = m.indices.len() * 4;
+  let bin_len  = 2 * attr_len + idx_len;
+
+  let mut json = format!(
+    concat!(
+      r#"{{"asset":{{"version":"2.0","generator":"pytest_lib"}},"scene":0,"scenes":[{{"nodes":[0]}}],"nodes":[{{"mesh":0}}],"#,
+      r#""meshes":[{{"primitives":[{{"attributes":{{"POSITION":0,"NORMAL":1}},"indices":2,"mode":4}}]}}],"#,
+      r#""buffers":[{{"byteLength":{bin_len}}}],"#,
+      r#""bufferViews":[{{"buffer":0,"byteOffset":0,"byteLength":{attr_len},"target":34962}},"#,
+      r#"{{"buffer":0,"byteOffset":{attr_len},"byteLength":{attr_len},"target":34962}},"#,
+      r#"{{"buffer":0,"byteOffset":{norm_end},"byteLength":{idx_len},"target":34963}}],"#,
+      r#""accessors":[{{"bufferView":0,"componentType":5126,"count":{n},"type":"VEC3","min":[{},{},{}],"max":[{},{},{}]}},"#,
+      r#"{{"bufferView":1,"componentType":5126,"count":{n},"type":"VEC3"}},"#,
+      r#"{{"bufferView":2,"componentType":5125,"count":{n_idx},"type":"SCALAR"}}]}}"#,
+    ),
+    min.x, min.y, min.z, max.x, max.y, max.z,
+    bin_len = bin_len, attr_len = attr_len, norm_end = 2 * attr_len, idx_len = idx_len,
+    n = n, n_idx = m.indices.len());
+
+  // chunks must be 4-byte aligned; JSON is padded with spaces, BIN is already a multiple of 4
+  while json.len() % 4 != 0 {
+    json.push(' ');
+  }
+
+  let total_len = 12 + 8 + json.len() + 8 + bin_len;
+  let total_len : u32 = total_len.try_into()
+    .map_err(|_| io::Error::new(io::ErrorKind::InvalidInput, "mesh too large for GLB (4 GiB limit)"))?;
+
+  w.write_all(b"glTF")?;
+  w.write_all(&2u32.to_le_bytes())?;
+  w.write_all(&total_len.to_le_bytes())?;
+
+  w.write_all(&(json.len() as u32).to_le_bytes())?;
+  w.write_all(b"JSON")?;
+  w.write_all(json.as_bytes())?;
+
+  w.write_all(&(bin_len as u32).to_le_bytes())?;
+  w.write_all(b"BIN\0")?;
+
+  for v in m.vertices.iter() {
+    w.write_all(&vec3_bytes(v.pos))?;
+  }
+
+  for v in m.vertices.iter() {
+    w.write_all(&vec3_bytes(v.norm))?;
+  }
+
+  for idx in m.indices.iter() {
+    w.write_all(&idx.to_le_bytes())?;
+  }
+
+  Ok(())
+}
@@ -1,23 +1,107 @@
+mod bvh;
+mod chunked;
+mod export;
 mod mesh;
+mod morph;
+mod points;
 mod spherical_harmonics;
 
 use pyo3::pymodule;
 
 #[pymodule]
 mod pytest_lib { 
+use std::path::PathBuf;
+
 use glam::vec3;
-use pyo3::{prelude::*, types::PyTuple};
+use ndarray::Array2;
+use numpy::{IntoPyArray, PyArray2};
+use pyo3::{exceptions::PyValueError, prelude::*, types::PyTuple};
+
+use crate::{chunked, mesh, points, spherical_harmonics};
+
+  #[pymodule_export]
+  use crate::mesh::Mesh;
+
+  #[pymodule_export]
+  use crate::bvh::Bvh;
+
+  #[pymodule_export]
+  use crate::morph::ShBasis;
+
+  #[pymodule_export]
+  use crate::chunked::ChunkedMesh;
+
+  fn coeff_or_default(coeff: Option<Vec<f32>>) -> PyResult<Vec<f32>> {
+    let coeff = coeff.unwrap_or_else(|| spherical_harmonics::DEFAULT_COEFF.to_vec());
 
-use crate::{mesh::{self, Mesh}, spherical_harmonics};
+    if spherical_harmonics::sh_degree(coeff.len()).is_none() {
+      return Err(PyValueError::new_err("number of SH coefficients must be a square (degree + 1)^2"));
+    }
+
+    Ok(coeff)
+  }
 
 
   #[pyfunction]
-  fn create_mesh(py: Python<'_>) -> PyResult<Mesh>  {
-    let mesh = spherical_harmonics::sh_mesh(4);
+  #[pyo3(signature = (depth=4, coeff=None))]
+  fn create_mesh(py: Python<'_>, depth: usize, coeff: Option<Vec<f32>>) -> PyResult<Mesh>  {
+    let coeff = coeff_or_default(coeff)?;
+
+    if depth > spherical_harmonics::MAX_DEPTH {
+      return Err(PyValueError::new_err(format!(
+        "depth must be <= {}, use generate_chunked_mesh for deeper meshes", spherical_harmonics::MAX_DEPTH)));
+    }
+
+    // built without the GIL, the viewer creates its mesh on a worker thread
+    let mesh = py.detach(|| spherical_harmonics::sh_mesh(depth, &coeff));
 
     return Ok(mesh);
 
     // Ok(mesh.to_numpy(py)?.unbind())
   }
-}
 
+  /// Value of the SH expansion in the direction (x,y,z), using the create_mesh coefficients by default.
+  #[pyfunction]
+  #[pyo3(signature = (x, y, z, coeff=None))]
+  fn sh_eval(x: f32, y: f32, z: f32, coeff: Option<Vec<f32>>) -> PyResult<f32> {
+    let coeff = coeff_or_default(coeff)?;
+
+    let d = vec3(x, y, z).normalize_or_zero();
+    Ok(spherical_harmonics::sh_value_func(&coeff)(d.x, d.y, d.z))
+  }
+
+  /// Streams a depth `depth` SH mesh octant by octant into the memory-mapped files
+  /// `<prefix>.vtx` and `<prefix>.idx`, see py/chunked_mesh.py for reading them back.
+  #[pyfunction]
+  #[pyo3(signature = (prefix, depth, coeff=None))]
+  fn generate_chunked_mesh(py: Python<'_>, prefix: PathBuf, depth: u32, coeff: Option<Vec<f32>>) -> PyResult<ChunkedMesh> {
+    let coeff = coeff_or_default(coeff)?;
+
+    if depth > chunked::MAX_DEPTH {
+      return Err(PyValueError::new_err(format!("depth must be <= {}", chunked::MAX_DEPTH)));
+    }
+
+    Ok(py.detach(|| chunked::generate(&prefix, depth, &coeff))?)
+  }
+
+  /// Point set in [-1,1]^2 as an (N,2) float32 array, `radius` is the sample spacing.
+  /// pattern is "poisson" (Poisson-disk, minimum distance radius) or "jittered" (one point per grid cell).
+  #[pyfunction]
+  #[pyo3(signature = (radius, pattern="poisson", seed=0))]
+  fn get_points<'py>(py: Python<'py>, radius: f32, pattern: &str, seed: u64) -> PyResult<Bound<'py, PyArray2<f32>>> {
+    if !radius.is_finite() || radius < points::MIN_RADIUS {
+      return Err(PyValueError::new_err(format!("radius must be finite and >= {}", points::MIN_RADIUS)));
+    }
+
+    let generate : fn(f32, u64) -> Vec<f32> = match pattern {
+      "poisson"  => points::poisson_disk,
+      "jittered" => points::jittered_grid,
+      _ => return Err(PyValueError::new_err(format!("unknown pattern {pattern:?}"))),
+    };
+
+    let flat = py.detach(|| generate(radius, seed));
+    let pts = Array2::from_shape_vec((flat.len() / 2, 2), flat).unwrap();
+
+    Ok(pts.into_pyarray(py))
+  }
+}
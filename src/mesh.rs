@@ -3,9 +3,9 @@ use std::default;
 use glam::{Vec3, vec3};
 use ndarray::Array2;
 use numpy::{Ix2, PyArray, ToPyArray};
-use pyo3::{Bound, IntoPyObject, PyResult, Python, pyclass, pymethods, types::PyTuple};
+use pyo3::{Bound, IntoPyObject, PyAny, PyResult, Python, pyclass, pymethods, types::PyTuple};
 
-use crate::spherical_harmonics;
+use crate::{export, spherical_harmonics};
 
 
 fn to_pyarray3<'py>(py: Python<'py>, v : impl ExactSizeIterator<Item = Vec3>) -> Bound<'py, PyArray<f32, Ix2>> {
@@ -68,6 +68,21 @@ impl Mesh {
 
     (pos, norm, idxs).into_pyobject(py)
   }
+
+  /// Writes a binary PLY to a path or any object with a write() method.
+  pub fn write_ply(&self, py: Python<'_>, target: &Bound<'_, PyAny>) -> PyResult<()> {
+    export::with_target(py, target, |w| export::write_ply(self, w))
+  }
+
+  /// Writes a Wavefront OBJ to a path or any object with a write() method.
+  pub fn write_obj(&self, py: Python<'_>, target: &Bound<'_, PyAny>) -> PyResult<()> {
+    export::with_target(py, target, |w| export::write_obj(self, w))
+  }
+
+  /// Writes a glTF 2.0 binary (GLB) to a path or any object with a write() method.
+  pub fn write_glb(&self, py: Python<'_>, target: &Bound<'_, PyAny>) -> PyResult<()> {
+    export::with_target(py, target, |w| export::write_glb(self, w))
+  }
 }
 
 /// Returns (positions, normals, indices)
@@ -0,0 +1,106 @@
+use std::collections::HashMap;
+
+use glam::Vec3;
+use numpy::PyReadwriteArray2;
+use pyo3::exceptions::PyValueError;
+use pyo3::{PyRef, PyResult, Python, pyclass, pymethods};
+use rayon::prelude::*;
+use sphrs::{Coordinates, HarmonicsSet, RealSH, SHEval};
+
+use crate::mesh::Mesh;
+
+
+/// SH basis functions sampled at the vertex directions of a mesh, so that a new coefficient set
+/// only costs a dot product per vertex instead of a full mesh rebuild.
+#[pyclass]
+pub struct ShBasis {
+  dirs    : Vec<Vec3>,
+  basis   : Vec<f32>,   // num_vertices x num_sh
+  num_sh  : usize,
+
+  // sphere_mesh duplicates vertices along triangle edges, normals are accumulated per welded vertex
+  weld    : Vec<u32>,
+  indices : Vec<u32>,
+}
+
+impl ShBasis {
+  pub fn new(m : &Mesh, degree : usize) -> Self {
+    let num_sh = (degree + 1) * (degree + 1);
+    // sphere_mesh keeps the undeformed unit direction in norm, pos is already scaled by |SH| and may be 0
+    let dirs : Vec<Vec3> = m.vertices.iter().map(|v| v.norm.normalize_or_zero()).collect();
+
+    let mut basis = vec![0.0; dirs.len() * num_sh];
+
+    basis.par_chunks_mut(num_sh).zip(dirs.par_iter()).for_each_init(
+      || HarmonicsSet::new(degree, RealSH::Spherical),
+      |sh, (out, d)| {
+        let p = Coordinates::cartesian(d.x, d.y, d.z);
+        out.copy_from_slice(&sh.eval(&p));
+      });
+
+    let mut canonical = HashMap::with_capacity(dirs.len());
+    let weld = dirs.iter().enumerate()
+      .map(|(i, d)| *canonical.entry(d.to_array().map(f32::to_bits)).or_insert(i as u32))
+      .collect();
+
+    Self { dirs, basis, num_sh, weld, indices: m.indices.clone() }
+  }
+
+  /// positions = dir * |sum(coeff * basis)|, normals are area-weighted face normals
+  pub fn eval_into(&self, coeff : &[f32], pos : &mut [f32], norm : &mut [f32]) {
+    pos.par_chunks_mut(3).zip(self.basis.par_chunks(self.num_sh)).zip(self.dirs.par_iter())
+      .for_each(|((p, b), d)| {
+        let r : f32 = b.iter().zip(coeff).map(|(b, c)| b * c).sum();
+        p.copy_from_slice(&(*d * r.abs()).to_array());
+      });
+
+    let p = |i : u32| Vec3::from_slice(&pos[3 * i as usize..]);
+    let mut acc = vec![Vec3::ZERO; self.dirs.len()];
+
+    for t in self.indices.chunks_exact(3) {
+      let (a, b, c) = (p(t[0]), p(t[1]), p(t[2]));
+      let n = (b - a).cross(c - a);
+
+      acc[self.weld[t[0] as usize] as usize] += n;
+      acc[self.weld[t[1] as usize] as usize] += n;
+      acc[self.weld[t[2] as usize] as usize] += n;
+    }
+
+    norm.par_chunks_mut(3).zip(self.weld.par_iter()).zip(self.dirs.par_iter())
+      .for_each(|((n, w), d)| {
+        n.copy_from_slice(&acc[*w as usize].try_normalize().unwrap_or(*d).to_array());
+      });
+  }
+}
+
+#[pymethods]
+impl ShBasis {
+  #[new]
+  fn py_new(py: Python<'_>, mesh: PyRef<'_, Mesh>, degree: usize) -> Self {
+    let mesh : &Mesh = &mesh;
+    py.detach(|| ShBasis::new(mesh, degree))
+  }
+
+  /// Writes the morphed (N,3) float32 positions and normals for `coeff` into the given arrays.
+  fn evaluate(&self, py: Python<'_>, coeff: Vec<f32>, mut positions: PyReadwriteArray2<'_, f32>, mut normals: PyReadwriteArray2<'_, f32>) -> PyResult<()> {
+    if coeff.len() != self.num_sh {
+      return Err(PyValueError::new_err(format!("expected {} coefficients, got {}", self.num_sh, coeff.len())));
+    }
+
+    let n = 3 * self.dirs.len();
+    let pos  = positions.as_slice_mut().map_err(|_| PyValueError::new_err("positions must be C-contiguous"))?;
+    let norm = normals.as_slice_mut().map_err(|_| PyValueError::new_err("normals must be C-contiguous"))?;
+
+    if pos.len() != n || norm.len() != n {
+      return Err(PyValueError::new_err(format!("positions and normals must have shape ({}, 3)", self.dirs.len())));
+    }
+
+    py.detach(|| self.eval_into(&coeff, pos, norm));
+    Ok(())
+  }
+
+  #[getter]
+  fn num_sh(&self) -> usize {
+    self.num_sh
+  }
+}
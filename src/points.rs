@@ -0,0 +1,128 @@
+use std::f32::consts::{SQRT_2, TAU};
+
+use rayon::prelude::*;
+
+// smallest supported spacing, ~2.7M points for poisson / 4M for jittered
+pub const MIN_RADIUS : f32 = 1e-3;
+
+// candidates per active point (Bridson)
+const POISSON_K : usize = 30;
+
+
+/// SplitMix64, good enough for sampling and keeps us free of an rng dependency
+struct Rng(u64);
+
+impl Rng {
+  fn new(seed : u64) -> Self {
+    Rng(seed)
+  }
+
+  fn next_u64(&mut self) -> u64 {
+    self.0 = self.0.wrapping_add(0x9E3779B97F4A7C15);
+    let mut z = self.0;
+    z = (z ^ (z >> 30)).wrapping_mul(0xBF58476D1CE4E5B9);
+    z = (z ^ (z >> 27)).wrapping_mul(0x94D049BB133111EB);
+    z ^ (z >> 31)
+  }
+
+  /// uniform in [0, 1)
+  fn next_f32(&mut self) -> f32 {
+    (self.next_u64() >> 40) as f32 / (1u64 << 24) as f32
+  }
+
+  fn below(&mut self, n : usize) -> usize {
+    (self.next_u64() % n as u64) as usize
+  }
+}
+
+/// Poisson-disk samples in [-1,1]^2 with minimum distance `radius` (Bridson's algorithm).
+/// Neighbour lookups go through a grid with cell size radius/sqrt(2), so each cell holds at most one point.
+/// Returns the points flattened as [x0, y0, x1, y1, ...].
+pub fn poisson_disk(radius : f32, seed : u64) -> Vec<f32> {
+  let cell = radius / SQRT_2;
+  let dim = ((2.0 / cell).ceil() as usize).max(1);
+  let r2 = radius * radius;
+
+  let mut rng = Rng::new(seed);
+  let mut grid = vec![u32::MAX; dim * dim];
+  let mut pts : Vec<[f32; 2]> = Vec::new();
+  let mut active : Vec<u32> = Vec::new();
+
+  let cell_of = |p : [f32; 2]| {
+    let cx = (((p[0] + 1.0) / cell) as usize).min(dim - 1);
+    let cy = (((p[1] + 1.0) / cell) as usize).min(dim - 1);
+    (cx, cy)
+  };
+
+  let insert = |p : [f32; 2], grid : &mut [u32], pts : &mut Vec<[f32; 2]>, active : &mut Vec<u32>| {
+    let (cx, cy) = cell_of(p);
+    grid[cy * dim + cx] = pts.len() as u32;
+    active.push(pts.len() as u32);
+    pts.push(p);
+  };
+
+  insert([2.0 * rng.next_f32() - 1.0, 2.0 * rng.next_f32() - 1.0], &mut grid, &mut pts, &mut active);
+
+  while !active.is_empty() {
+    let a = rng.below(active.len());
+    let base = pts[active[a] as usize];
+    let mut found = false;
+
+    for _ in 0..POISSON_K {
+      // uniform by area in the annulus [r, 2r)
+      let d = radius * (1.0 + 3.0 * rng.next_f32()).sqrt();
+      let phi = TAU * rng.next_f32();
+      let p = [base[0] + d * phi.cos(), base[1] + d * phi.sin()];
+
+      if !(-1.0..1.0).contains(&p[0]) || !(-1.0..1.0).contains(&p[1]) { continue }
+
+      let (cx, cy) = cell_of(p);
+      let mut ok = true;
+
+      'neighbours: for y in cy.saturating_sub(2)..(cy + 3).min(dim) {
+        for x in cx.saturating_sub(2)..(cx + 3).min(dim) {
+          let k = grid[y * dim + x];
+          if k == u32::MAX { continue }
+
+          let q = pts[k as usize];
+          if (q[0] - p[0]).powi(2) + (q[1] - p[1]).powi(2) < r2 {
+            ok = false;
+            break 'neighbours;
+          }
+        }
+      }
+
+      if ok {
+        insert(p, &mut grid, &mut pts, &mut active);
+        found = true;
+        break;
+      }
+    }
+
+    if !found {
+      active.swap_remove(a);
+    }
+  }
+
+  pts.into_iter().flatten().collect()
+}
+
+/// One uniformly jittered sample per cell of a grid with spacing `radius` over [-1,1]^2.
+/// Rows are generated in parallel, each from its own seeded stream, so the result is deterministic.
+pub fn jittered_grid(radius : f32, seed : u64) -> Vec<f32> {
+  let m = ((2.0 / radius).ceil() as usize).max(1);
+  let step = 2.0 / m as f32;
+
+  let mut out = vec![0.0; 2 * m * m];
+
+  out.par_chunks_mut(2 * m).enumerate().for_each(|(row, out)| {
+    let mut rng = Rng::new(seed ^ (row as u64).wrapping_mul(0xD1B54A32D192ED03));
+
+    for (col, p) in out.chunks_exact_mut(2).enumerate() {
+      p[0] = -1.0 + step * (col as f32 + rng.next_f32());
+      p[1] = -1.0 + step * (row as f32 + rng.next_f32());
+    }
+  });
+
+  out
+}
@@ -35,38 +35,36 @@ pub fn subdiv_rec(m : &mut Mesh, a_idx : u32, b_idx : u32, c_idx : u32, depth :
   rec(ab_idx, bc_idx, ca_idx)
 }
 
+pub const OCTAHEDRON_VERTICES : [Vec3; 6] = [
+  Vec3::new(-1.0,  0.0, 0.0),
+  Vec3::new( 0.0, -1.0, 0.0),
+  Vec3::new( 1.0,  0.0, 0.0),
+  Vec3::new( 0.0,  1.0, 0.0),
+
+  Vec3::new( 0.0,  0.0, 1.0), // idx 4 = north pole
+  Vec3::new( 0.0,  0.0,-1.0), // idx 5 = south pole
+];
+
+pub const OCTAHEDRON_TRIS : [(u32, u32, u32); 8] = [
+  (0,1,4),
+  (1,2,4),
+  (2,3,4),
+  (3,0,4),
+  (1,0,5),
+  (2,1,5),
+  (3,2,5),
+  (0,3,5),
+];
+
 pub fn sphere_mesh(depth : usize, radius_func : impl Fn(f32, f32, f32) -> f32) -> Mesh {
-  println!("creating sphere mesh");
-  
   let mut m = Mesh::new();
 
-  let v = [
-    vec3(-1.0,  0.0, 0.0),
-    vec3( 0.0, -1.0, 0.0),
-    vec3( 1.0,  0.0, 0.0),
-    vec3( 0.0,  1.0, 0.0),
-
-    vec3( 0.0,  0.0, 1.0), // idx 4 = north pole
-    vec3( 0.0,  0.0,-1.0), // idx 5 = south pole
-  ];
-
-  for (idx, p) in v.into_iter().enumerate() {
+  for (idx, p) in OCTAHEDRON_VERTICES.into_iter().enumerate() {
     let idx2 = m.add_vtx(p, p);
     assert_eq!(idx, idx2 as usize);
   }
 
-  let tris = [
-    (0,1,4),
-    (1,2,4),
-    (2,3,4),
-    (3,0,4),
-    (1,0,5),
-    (2,1,5),
-    (3,2,5),
-    (0,3,5),
-  ];
-
-  for (a,b,c) in tris.into_iter() {
+  for (a,b,c) in OCTAHEDRON_TRIS.into_iter() {
     subdiv_rec(&mut m, a, b, c, depth);
   }
 
@@ -78,24 +76,38 @@ pub fn sphere_mesh(depth : usize, radius_func : impl Fn(f32, f32, f32) -> f32) -
   m
 }
 
-pub fn sh_mesh(depth : usize) -> Mesh {
-  let degree = 1;
+/// default coefficients used by create_mesh (degree 1, a single lobe along the last basis function)
+pub const DEFAULT_COEFF : [f32; 4] = [0.0, 0.0, 0.0, 1.0];
 
-  let sh = HarmonicsSet::new(degree, RealSH::Spherical);
+/// degree of a coefficient set, if it has (degree + 1)^2 entries
+pub fn sh_degree(num_coeff : usize) -> Option<usize> {
+  let d = (num_coeff as f64).sqrt() as usize;
+
+  if d > 0 && d * d == num_coeff { Some(d - 1) } else { None }
+}
 
-  let coeff = vec![1.0; sh.num_sh()];
-  let coeff = [0.0, 0.0, 0.0, 1.0];
+/// signed value of the SH expansion at the direction (x,y,z)
+pub fn sh_value_func(coeff : &[f32]) -> impl Fn(f32, f32, f32) -> f32 + '_ {
+  let degree = sh_degree(coeff.len()).expect("number of SH coefficients must be a square");
 
-  println!("{:?}", coeff);
+  let sh = HarmonicsSet::new(degree, RealSH::Spherical);
 
-  let radius_func = |x,y,z| {
+  move |x,y,z| {
     let p = Coordinates::cartesian(x, y, z);
-    let set = sh.eval_with_coefficients(&p, coeff.as_slice());
+    let set = sh.eval_with_coefficients(&p, coeff);
     let r : f32 = set.iter().sum();
 
+    r
+  }
+}
+
+// sphere_mesh holds ~8 * 4^depth vertices and 24 * 4^depth indices in memory, ~300 MB at depth 10;
+// deeper meshes go through chunked::generate
+pub const MAX_DEPTH : usize = 10;
 
-    r.abs()
-  };
+pub fn sh_mesh(depth : usize, coeff : &[f32]) -> Mesh {
+  let value = sh_value_func(coeff);
+  let radius_func = |x,y,z| value(x,y,z).abs();
 
   sphere_mesh(depth, radius_func)
-}
\ No newline at end of file
+}